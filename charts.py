@@ -0,0 +1,256 @@
+'''
+Pi-hole DNS traffic visualizer for the Raspberry Pi Sense HAT
+By Sam Lindley, 2/21/2018
+'''
+
+import operator
+import random
+
+import utils
+
+ICON = [
+    [1, 2, 3, 4, 5, 6],
+    [0, 7],
+    [2, 3, 4, 5],
+    [1, 6],
+    [3, 4],
+    [2, 5],
+    [3, 4]
+]
+
+QUERY_COLORS = {
+    "A (IPv4)": (0, 26, 65),        #navy
+    "AAAA (IPv6)": (0, 180, 251),   #sky blue
+    "ANY": (255, 132, 34),          #orange
+    "SRV": (250, 101, 96),          #pink
+    "SOA": (67, 108, 52),           #moss green
+    "PTR": (142, 58, 137),          #purple
+    "TXT": (255, 255, 255),         #white
+}
+OTHER_QUERY_COLOR = (128, 128, 128) #grey
+
+def scale(value, minimum, maximum):
+    return (value - minimum) / (maximum - minimum) if maximum > minimum else 0
+
+
+def build_models(status, raw_data, interval_data):
+    """
+    Reduce the server data to resolution independent chart models, with all
+    levels expressed as fractions between 0 and 1.
+    """
+    models = {}
+
+    models['icon'] = status
+
+    #calculate minimum and maximum values to scale graph appropriately
+    domain_min = min(i[0] for i in interval_data)
+    domain_max = max(i[0] for i in interval_data)
+    ad_min = min(i[1] for i in interval_data)
+    ad_max = max(i[1] for i in interval_data)
+    models['vertical'] = [(scale(i[0], domain_min, domain_max), scale(i[1], ad_min, ad_max)) \
+                          for i in interval_data]
+
+    models['spiral'] = float(raw_data['ads_percentage_today']) / 100
+
+    if 'top_sources' in raw_data and 'querytypes' in raw_data:
+        source_list = [source[1] for source in sorted(raw_data['top_sources'].items(), \
+                       key=operator.itemgetter(1), reverse=True)]
+        if source_list:
+            source_max = source_list[0]
+            source_min = source_list[-1] if len(source_list) > 1 else 0
+            models['horizontal'] = [scale(source, source_min, source_max) for source in source_list]
+        else:
+            models['horizontal'] = []
+
+        models['pie'] = dict(raw_data['querytypes'])
+
+    return models
+
+
+def display_levels(models, size):
+    """
+    Rounds chart models to the pixel levels drawn on a display of the given
+    size, so that changes too small to be seen compare equal.
+    """
+    grid_size = size * size
+    levels = {}
+
+    for mode, model in models.items():
+        if mode == 'vertical':
+            levels[mode] = tuple((int(i[0] * size), int(i[0] * 8), int(i[1] * 8)) \
+                                 for i in model[:size])
+        elif mode == 'spiral':
+            levels[mode] = int(grid_size * model)
+        elif mode == 'horizontal':
+            levels[mode] = tuple(int(level * size) for level in model[:size])
+        elif mode == 'pie':
+            levels[mode] = tuple(sorted((category, int((model[category] / 100) * grid_size)) \
+                                        for category in model))
+        else:
+            levels[mode] = model
+
+    return levels
+
+
+def rasterize(mode, model, size, color, randomize):
+    """
+    Returns the animation frames of a chart for a square display of the given
+    size. Each frame is a list of (x, y, color) pixels and the number of 8x8
+    animation steps it stands for, so that every display takes the same time
+    to draw a chart regardless of its resolution.
+    """
+    if mode == 'icon':
+        return connectivity_icon(model, size, randomize)
+    elif mode == 'vertical':
+        return bar_chart_vertical(model, color, size, randomize)
+    elif mode == 'spiral':
+        return spiral_graph(model, size, randomize)
+    elif mode == 'horizontal':
+        return bar_chart_horizontal(model, color, size, randomize)
+    elif mode == 'pie':
+        return pie_chart(model, size, randomize)
+
+
+def pixel_step(size):
+    return (8 / size) ** 2
+
+
+def sequence(pixels, size, randomize):
+    step = pixel_step(size)
+
+    return [([pixel], step) for pixel in (random.sample(pixels, len(pixels)) if randomize \
+            else pixels)]
+
+
+def connectivity_icon(status, size, randomize):
+    color = (0, 255, 0) if status else (255, 0, 0)
+    block_size = max(size // 8, 1)
+    offset = (size - block_size * 8) // 2
+    frames = []
+
+    def block(col, row):
+        return [(offset + col * block_size + i, offset + row * block_size + j, color) \
+                for j in range(block_size) for i in range(block_size)]
+
+    for row in random.sample(range(0, 7), 7) if randomize else range(6, -1, -1):
+        if randomize:
+            for col in random.sample(ICON[row], len(ICON[row])):
+                frames.append((block(col, row), 1))
+        else:
+            frames.append(([pixel for col in ICON[row] for pixel in block(col, row)], 8))
+
+    return frames
+
+
+def bar_chart_vertical(levels, color, size, randomize):
+    info_chart = [(int(i[0] * size), i) for i in levels[:size]]
+    step = pixel_step(size)
+    frames = []
+
+    #handles cases of incomplete data
+    while len(info_chart) < size:
+        info_chart.append((0, (0, 0)))
+
+    info_chart = list(reversed(info_chart))
+
+    for col in random.sample(range(0, size), size) if randomize else range(0, size):
+        height, (domain_level, ad_level) = info_chart[col]
+
+        #if color not set, default to red for all values
+        if color == 'traffic':
+            pixel_color = utils.color_dict(int(domain_level * 8))
+        elif color == 'ads':
+            pixel_color = utils.color_dict(int(ad_level * 8))
+        else:
+            pixel_color = (255, 0, 0)
+
+        for row in random.sample(range(0, height), height) if randomize else range(0, height):
+            frames.append(([(col, size - 1 - row, pixel_color)], step))
+
+    return frames
+
+
+def spiral_graph(block_percentage, size, randomize):
+    grid_size = size * size
+    grid_list = []
+    x = y = (size - 1) // 2
+    dx = 0
+    dy = 1
+    pivot_index = 0
+    pivot_point = 1
+
+    grid_units = int(grid_size * block_percentage)
+
+    for i in range(grid_size):
+        if 0 <= x < size and 0 <= y < size:
+            grid_list.append((x, size - 1 - y, (255, 0, 0) if i < grid_units else (0, 0, 255)))
+
+        if pivot_index == pivot_point:
+            if dx == 0:
+                dx, dy = dy, dx
+                pivot_index = 0
+            elif dy == 0:
+                dx, dy = dy, -dx
+                pivot_index = 0
+                pivot_point += 1
+
+        x += dx
+        y += dy
+        pivot_index += 1
+
+    return sequence(grid_list, size, randomize)
+
+
+def bar_chart_horizontal(levels, color, size, randomize):
+    info_chart = list(levels[:size])
+    step = pixel_step(size)
+    frames = []
+
+    #handles cases of incomplete data
+    while len(info_chart) < size:
+        info_chart.append(0)
+
+    for row in random.sample(range(0, size), size) if randomize else range(0, size):
+        width = int(info_chart[row] * size)
+        pixel_color = (255, 0, 0) if color == 'basic' else \
+                      utils.color_dict(int(info_chart[row] * 8))
+
+        for col in random.sample(range(0, width), width) if randomize else range(0, width):
+            frames.append(([(col, row, pixel_color)], step))
+
+    return frames
+
+
+def pie_chart(query_types, size, randomize):
+    grid_size = size * size
+    grid_list = []
+    counter = 0
+
+    query_types = {category: int((query_types[category] / 100) * grid_size) \
+                   for category in query_types}
+
+    current_type = max(query_types, key=query_types.get)
+    last_valid = current_type
+
+    #fill the right half from the top, then the left half from the bottom
+    cells = [(col, row) for row in range(0, size) for col in range(size // 2, size)] + \
+            [(col, row) for row in range(size - 1, -1, -1) for col in range(size // 2 - 1, -1, -1)]
+
+    for col, row in cells:
+        if counter < query_types.get(current_type, 0):
+            grid_list.append((col, row, QUERY_COLORS.get(current_type, OTHER_QUERY_COLOR)))
+            last_valid = current_type
+        else:
+            query_types.pop(current_type, None)
+            counter = 0
+            if query_types:
+                current_type = max(query_types, key=query_types.get)
+                if query_types[current_type]:
+                    last_valid = current_type
+
+            grid_list.append((col, row, QUERY_COLORS.get(current_type if \
+                              query_types.get(current_type) else last_valid, OTHER_QUERY_COLOR)))
+
+        counter += 1
+
+    return sequence(grid_list, size, randomize)
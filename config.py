@@ -6,11 +6,39 @@ By Sam Lindley, 2/21/2018
 import logging
 import os
 
-from sense_hat import SenseHat
-
-SENSE = SenseHat()
+#created by the sense output when selected, also provides the joystick
+SENSE = None
 RIPPLE_SPEED = 0.025
 
+#seconds between server polls at full power, matching the former 15 charts per poll of
+#roughly 1.6 seconds drawing and 2 seconds hold each
+POLL_INTERVAL = 55
+
+#render settings applied by the power governor, ordered from highest to lowest power draw
+POWER_PROFILES = {
+    'full': {'ripple_speed': RIPPLE_SPEED, 'poll': POLL_INTERVAL, 'hold': 2, 'lowlight': False},
+    'reduced': {'ripple_speed': RIPPLE_SPEED * 2, 'poll': POLL_INTERVAL * 2, 'hold': 5, \
+                'lowlight': False},
+    'minimal': {'ripple_speed': RIPPLE_SPEED * 4, 'poll': POLL_INTERVAL * 4, 'hold': 10, \
+                'lowlight': True},
+}
+
+#grid size of each output and the number of animation steps drawn per refresh, which sets
+#its frame rate without changing how long a chart takes to draw
+OUTPUTS = {
+    'sense': {'size': 8, 'frame_steps': 1},
+    'matrix': {'size': 32, 'frame_steps': 2},
+    'terminal': {'size': 8, 'frame_steps': 4},
+}
+
+#process cpu share and per-core load average above which the governor steps down
+CPU_THRESHOLDS = {'reduced': 0.10, 'minimal': 0.25}
+LOAD_THRESHOLDS = {'reduced': 0.75, 'minimal': 1.5}
+
+#readings must stay below this share of a threshold for this many polls before stepping up
+STEP_UP_MARGIN = 0.5
+STEP_UP_READINGS = 3
+
 if os.geteuid() == 0:
     LOGGER = logging.getLogger(__name__)
     LOGGER.setLevel(logging.INFO)
@@ -0,0 +1,107 @@
+'''
+Pi-hole DNS traffic visualizer for the Raspberry Pi Sense HAT
+By Sam Lindley, 2/21/2018
+'''
+
+import os
+import time
+
+import config
+
+def cpu_usage():
+    """
+    Share of one core consumed by this process since the previous call.
+    """
+    cpu_time = time.process_time()
+    wall_time = time.monotonic()
+
+    if not hasattr(cpu_usage, "last_sample"):
+        cpu_usage.last_sample = (cpu_time, wall_time)
+        return 0.0
+
+    last_cpu, last_wall = cpu_usage.last_sample
+    cpu_usage.last_sample = (cpu_time, wall_time)
+
+    elapsed = wall_time - last_wall
+
+    return (cpu_time - last_cpu) / elapsed if elapsed > 0 else 0.0
+
+
+def system_load():
+    """
+    One minute load average divided by the number of cores.
+    """
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except OSError:
+        return 0.0
+
+
+def in_quiet_hours(quiet_hours):
+    if not quiet_hours:
+        return False
+
+    start, end = quiet_hours
+    hour = time.localtime().tm_hour
+
+    #handles schedules that wrap past midnight
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+def reading_profile(cpu, load, margin=1):
+    if cpu > config.CPU_THRESHOLDS['minimal'] * margin or \
+       load > config.LOAD_THRESHOLDS['minimal'] * margin:
+        return 'minimal'
+    elif cpu > config.CPU_THRESHOLDS['reduced'] * margin or \
+         load > config.LOAD_THRESHOLDS['reduced'] * margin:
+        return 'reduced'
+    return 'full'
+
+
+def select_profile(power, quiet_hours):
+    if power != 'auto':
+        return power
+
+    levels = list(config.POWER_PROFILES)
+    current = getattr(select_profile, "current", 'full')
+
+    if not hasattr(select_profile, "calm_readings"):
+        select_profile.calm_readings = 0
+
+    #sample on every poll so the first reading after quiet hours covers a single poll
+    cpu = cpu_usage()
+    load = system_load()
+
+    if in_quiet_hours(quiet_hours):
+        profile = 'minimal'
+        select_profile.calm_readings = 0
+    else:
+        profile = reading_profile(cpu, load)
+
+        #stepping down lowers cpu usage, so only step back up after several readings well
+        #under the thresholds to keep the profile from flipping on every poll
+        if levels.index(profile) < levels.index(current):
+            profile = reading_profile(cpu, load, config.STEP_UP_MARGIN)
+
+            if levels.index(profile) < levels.index(current):
+                select_profile.calm_readings += 1
+            else:
+                select_profile.calm_readings = 0
+
+            if select_profile.calm_readings < config.STEP_UP_READINGS:
+                profile = current
+        else:
+            select_profile.calm_readings = 0
+
+    if profile != current:
+        select_profile.calm_readings = 0
+
+        if os.geteuid() == 0:
+            config.LOGGER.info('Power profile set to %s.' % profile)
+        print('Power profile set to %s.' % profile)
+
+    select_profile.current = profile
+
+    return profile
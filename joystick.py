@@ -7,6 +7,7 @@ import os
 import sys
 
 import config
+import outputs
 
 def up_pushed(color):
     color_options = ('basic', 'traffic', 'ads')
@@ -67,6 +68,6 @@ def middle_held():
         config.LOGGER.info('Program terminated by user.')
     print('Program terminated by user.')
 
-    config.SENSE.clear()
+    outputs.stop_outputs()
 
     sys.exit()
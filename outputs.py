@@ -0,0 +1,245 @@
+'''
+Pi-hole DNS traffic visualizer for the Raspberry Pi Sense HAT
+By Sam Lindley, 2/21/2018
+'''
+
+import os
+import sys
+import threading
+
+import charts
+import config
+
+try:
+    from sense_hat import SenseHat
+except ImportError:
+    SenseHat = None
+
+try:
+    from rgbmatrix import RGBMatrix, RGBMatrixOptions
+except ImportError:
+    RGBMatrix = None
+
+#latest chart models and display settings, replaced by the event loop once per poll
+CONDITION = threading.Condition()
+SNAPSHOT = None
+
+#set on exit so that workers stop drawing before their displays are cleared
+STOP = threading.Event()
+WORKERS = []
+
+
+class SenseDisplay:
+    def __init__(self, size):
+        if SenseHat is None:
+            if os.geteuid() == 0:
+                config.LOGGER.error('The sense_hat module is required to drive a Sense HAT.')
+            print('Error: The sense_hat module is required to drive a Sense HAT.')
+            sys.exit(1)
+
+        self.size = size
+        config.SENSE = SenseHat()
+
+    def clear(self):
+        config.SENSE.clear()
+
+    def set_rotation(self, orientation):
+        config.SENSE.set_rotation(orientation)
+
+    def set_low_light(self, lowlight):
+        config.SENSE.low_light = lowlight
+
+    def set_pixel(self, x, y, color):
+        config.SENSE.set_pixel(x, y, color)
+
+    def show(self):
+        pass
+
+
+class BufferedDisplay:
+    """
+    Base for displays without hardware rotation. Pixels are rotated in
+    software to match the Sense HAT, and written out by show().
+    """
+    def __init__(self, size):
+        self.size = size
+        self.orientation = 0
+        self.lowlight = False
+        self.buffer = [[(0, 0, 0)] * size for _ in range(size)]
+
+    def clear(self):
+        self.buffer = [[(0, 0, 0)] * self.size for _ in range(self.size)]
+        self.show()
+
+    def set_rotation(self, orientation):
+        self.orientation = orientation
+
+    def set_low_light(self, lowlight):
+        self.lowlight = lowlight
+
+    def rotate(self, x, y):
+        last = self.size - 1
+
+        if self.orientation == 90:
+            return last - y, x
+        elif self.orientation == 180:
+            return last - x, last - y
+        elif self.orientation == 270:
+            return y, last - x
+        return x, y
+
+    def set_pixel(self, x, y, color):
+        x, y = self.rotate(x, y)
+        self.buffer[y][x] = color
+
+    def show(self):
+        pass
+
+
+class MatrixDisplay(BufferedDisplay):
+    def __init__(self, size):
+        if RGBMatrix is None:
+            if os.geteuid() == 0:
+                config.LOGGER.error('The rgbmatrix module is required to drive a HUB75 panel.')
+            print('Error: The rgbmatrix module is required to drive a HUB75 panel.')
+            sys.exit(1)
+
+        BufferedDisplay.__init__(self, size)
+
+        options = RGBMatrixOptions()
+        options.rows = size
+        options.cols = size
+        #stay root so the sense output can keep writing to its framebuffer
+        options.drop_privileges = False
+        self.matrix = RGBMatrix(options=options)
+
+    #pixels are written straight to the panel rather than copied from a buffer on every frame
+    def clear(self):
+        self.matrix.Clear()
+
+    def set_low_light(self, lowlight):
+        self.lowlight = lowlight
+        self.matrix.brightness = 25 if lowlight else 100
+
+    def set_pixel(self, x, y, color):
+        x, y = self.rotate(x, y)
+        self.matrix.SetPixel(x, y, *color)
+
+
+class TerminalDisplay(BufferedDisplay):
+    def __init__(self, size):
+        BufferedDisplay.__init__(self, size)
+
+        sys.stdout.write('\x1b[2J')
+
+    def show(self):
+        dim = 3 if self.lowlight else 1
+        lines = ['\x1b[H']
+
+        for row in self.buffer:
+            lines.append(''.join('\x1b[38;2;%d;%d;%dm██' % tuple(c // dim for c in color) \
+                                 for color in row) + '\x1b[0m\n')
+
+        sys.stdout.write(''.join(lines))
+        sys.stdout.flush()
+
+
+DISPLAYS = {
+    'sense': SenseDisplay,
+    'matrix': MatrixDisplay,
+    'terminal': TerminalDisplay,
+}
+
+
+def publish(snapshot):
+    global SNAPSHOT
+
+    with CONDITION:
+        SNAPSHOT = snapshot
+        CONDITION.notify_all()
+
+
+def play(display, frames, delay, frame_steps, orientation, lowlight):
+    pending = 0
+
+    display.clear()
+    display.set_rotation(orientation)
+    display.set_low_light(lowlight)
+
+    #refresh once every frame_steps 8x8 animation steps, so larger displays and slower
+    #outputs draw several pixels per frame while taking the same time to draw a chart
+    for pixels, steps in frames:
+        if STOP.is_set():
+            return
+
+        for x, y, color in pixels:
+            display.set_pixel(x, y, color)
+
+        pending += steps
+        if pending >= frame_steps:
+            display.show()
+            STOP.wait(delay * pending)
+            pending = 0
+
+    display.show()
+
+
+def run_output(display, frame_steps):
+    counter = 0
+    drawn = None
+
+    while not STOP.is_set():
+        with CONDITION:
+            CONDITION.wait_for(lambda: SNAPSHOT is not None or STOP.is_set())
+            snapshot = SNAPSHOT
+
+        if STOP.is_set():
+            break
+
+        #leave the latest chart on display until the statistics or settings change
+        if snapshot['idle'] and drawn is not None:
+            with CONDITION:
+                CONDITION.wait_for(lambda: SNAPSHOT is not snapshot or STOP.is_set())
+            continue
+
+        mode = snapshot['modes'][counter % len(snapshot['modes'])]
+        counter += 1
+
+        #keep this output running through a failed chart, as other outputs cannot notice
+        try:
+            frames = charts.rasterize(mode, snapshot['models'][mode], display.size, \
+                                      snapshot['color'], snapshot['randomize'])
+            play(display, frames, snapshot['ripple_speed'], frame_steps, \
+                 snapshot['orientation'], snapshot['lowlight'])
+            drawn = mode
+        except Exception as error:
+            if os.geteuid() == 0:
+                config.LOGGER.exception("Failed to draw '%s' chart on %s output." \
+                                        % (mode, threading.current_thread().name))
+            print("Error: Failed to draw '%s' chart on %s output: %r" \
+                  % (mode, threading.current_thread().name, error))
+
+        with CONDITION:
+            CONDITION.wait_for(lambda: SNAPSHOT is not snapshot or STOP.is_set(), \
+                               timeout=snapshot['hold'])
+
+
+def start_outputs(names):
+    for name in names:
+        display = DISPLAYS[name](config.OUTPUTS[name]['size'])
+        worker = threading.Thread(target=run_output, name=name, daemon=True, \
+                                  args=(display, config.OUTPUTS[name]['frame_steps']))
+        worker.start()
+
+        WORKERS.append((worker, display))
+
+
+def stop_outputs():
+    STOP.set()
+
+    with CONDITION:
+        CONDITION.notify_all()
+
+    for worker, display in WORKERS:
+        worker.join(timeout=5)
+        display.clear()